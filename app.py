@@ -1,8 +1,123 @@
 import streamlit as st
+import os
 import re
-import base64
+import time
+import hashlib
+import tempfile
+import uuid
+import zipfile
 from pathlib import Path
 
+import document_cache
+from artifact_store import ArtifactStore
+from conversion_pool import ConversionError, ConversionPool, ConversionQueueFull, ConversionTimeout
+
+# 변환 작업 제한
+MAX_INPUT_BYTES = 5 * 1024 * 1024        # 이보다 큰 입력은 거부
+INLINE_CONVERSION_BYTES = 64 * 1024      # 이보다 작은 입력은 워커 없이 바로 변환
+CONVERSION_TIMEOUT_SECONDS = 60
+MAX_QUEUED_CONVERSIONS = 8
+ARTIFACT_MEMORY_BUDGET = 128 * 1024 * 1024   # 모든 세션의 변환 결과(압축 상태)에 쓰는 메모리 상한
+ARTIFACT_EVICTED_MESSAGE = "서버 메모리 정리로 변환 결과가 삭제되었습니다. 설정을 바꾸거나 새로고침하면 다시 변환됩니다."
+
+def simple_md_to_html(md_content):
+    """Simple markdown to HTML converter as fallback"""
+    html_content = md_content
+    
+    # Convert headers
+    html_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
+    html_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
+    html_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
+    
+    # Handle table of contents format (numbered list with links on a single line)
+    toc_pattern = r'([0-9]+)\. \[(.*?)\]\((.*?)\)'
+    if re.search(toc_pattern, html_content):
+        # If contents is detected, put each item on a new line before processing
+        content_with_breaks = ""
+        for line in html_content.split('\n'):
+            if re.search(toc_pattern, line):
+                # Separate numbered list items
+                items = re.findall(r'([0-9]+)\. \[(.*?)\]\((.*?)\)', line)
+                if items:
+                    for item in items:
+                        content_with_breaks += f"{item[0]}. [{item[1]}]({item[2]})\n"
+                    content_with_breaks += "\n"
+                else:
+                    content_with_breaks += line + "\n"
+            else:
+                content_with_breaks += line + "\n"
+        
+        html_content = content_with_breaks
+    
+    # Convert numbered lists (must come before regular paragraph conversion)
+    list_items = []
+    in_list = False
+    
+    new_content = []
+    for line in html_content.split('\n'):
+        # Match numbered list pattern
+        match = re.match(r'([0-9]+)\. (.*?)', line)
+        if match:
+            if not in_list:
+                new_content.append('<ol>')
+                in_list = True
+            # Convert any markdown links in list items
+            item_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', match.group(2))
+            new_content.append(f'<li>{item_content}</li>')
+        else:
+            if in_list:
+                new_content.append('</ol>')
+                in_list = False
+            new_content.append(line)
+    
+    if in_list:
+        new_content.append('</ol>')
+        
+    html_content = '\n'.join(new_content)
+    
+    # Convert links (that aren't already converted in lists)
+    html_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html_content)
+    
+    # Convert paragraphs (lines followed by blank lines)
+    html_content = re.sub(r'([^\n]+)\n\n', r'<p>\1</p>\n\n', html_content)
+    
+    # Convert bold
+    html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
+    
+    # Convert italic
+    html_content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html_content)
+    
+    # Convert unordered lists
+    list_items = []
+    in_list = False
+    
+    new_content = []
+    for line in html_content.split('\n'):
+        match = re.match(r'- (.*?)', line)
+        if match:
+            if not in_list:
+                new_content.append('<ul>')
+                in_list = True
+            new_content.append(f'<li>{match.group(1)}</li>')
+        else:
+            if in_list:
+                new_content.append('</ul>')
+                in_list = False
+            new_content.append(line)
+    
+    if in_list:
+        new_content.append('</ul>')
+        
+    html_content = '\n'.join(new_content)
+    
+    # Convert code blocks
+    html_content = re.sub(r'```(.*?)```', r'<pre><code>\1</code></pre>', html_content, flags=re.DOTALL)
+    
+    # Convert inline code
+    html_content = re.sub(r'`(.*?)`', r'<code>\1</code>', html_content)
+    
+    return html_content
+
 # Try to import markdown, but have a fallback method
 try:
     import markdown
@@ -10,219 +125,87 @@ try:
     def convert_md_to_html(md_content):
         """Convert markdown to HTML using the markdown package"""
         return markdown.markdown(md_content, extensions=['extra', 'codehilite', 'tables'])
+    
+    PARSER_ID = f"markdown {markdown.__version__}"
         
 except ImportError:
     # Fallback simple markdown to HTML converter
-    def convert_md_to_html(md_content):
-        """Simple markdown to HTML converter as fallback"""
-        html_content = md_content
-        
-        # Convert headers
-        html_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-        html_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
-        html_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-        
-        # Handle table of contents format (numbered list with links on a single line)
-        toc_pattern = r'([0-9]+)\. \[(.*?)\]\((.*?)\)'
-        if re.search(toc_pattern, html_content):
-            # If contents is detected, put each item on a new line before processing
-            content_with_breaks = ""
-            for line in html_content.split('\n'):
-                if re.search(toc_pattern, line):
-                    # Separate numbered list items
-                    items = re.findall(r'([0-9]+)\. \[(.*?)\]\((.*?)\)', line)
-                    if items:
-                        for item in items:
-                            content_with_breaks += f"{item[0]}. [{item[1]}]({item[2]})\n"
-                        content_with_breaks += "\n"
-                    else:
-                        content_with_breaks += line + "\n"
-                else:
-                    content_with_breaks += line + "\n"
-            
-            html_content = content_with_breaks
-        
-        # Convert numbered lists (must come before regular paragraph conversion)
-        list_items = []
-        in_list = False
-        
-        new_content = []
-        for line in html_content.split('\n'):
-            # Match numbered list pattern
-            match = re.match(r'([0-9]+)\. (.*?)', line)
-            if match:
-                if not in_list:
-                    new_content.append('<ol>')
-                    in_list = True
-                # Convert any markdown links in list items
-                item_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', match.group(2))
-                new_content.append(f'<li>{item_content}</li>')
-            else:
-                if in_list:
-                    new_content.append('</ol>')
-                    in_list = False
-                new_content.append(line)
-        
-        if in_list:
-            new_content.append('</ol>')
-            
-        html_content = '\n'.join(new_content)
-        
-        # Convert links (that aren't already converted in lists)
-        html_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html_content)
-        
-        # Convert paragraphs (lines followed by blank lines)
-        html_content = re.sub(r'([^\n]+)\n\n', r'<p>\1</p>\n\n', html_content)
-        
-        # Convert bold
-        html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
-        
-        # Convert italic
-        html_content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html_content)
-        
-        # Convert unordered lists
-        list_items = []
-        in_list = False
-        
-        new_content = []
-        for line in html_content.split('\n'):
-            match = re.match(r'- (.*?)', line)
-            if match:
-                if not in_list:
-                    new_content.append('<ul>')
-                    in_list = True
-                new_content.append(f'<li>{match.group(1)}</li>')
-            else:
-                if in_list:
-                    new_content.append('</ul>')
-                    in_list = False
-                new_content.append(line)
-        
-        if in_list:
-            new_content.append('</ul>')
-            
-        html_content = '\n'.join(new_content)
-        
-        # Convert code blocks
-        html_content = re.sub(r'```(.*?)```', r'<pre><code>\1</code></pre>', html_content, flags=re.DOTALL)
-        
-        # Convert inline code
-        html_content = re.sub(r'`(.*?)`', r'<code>\1</code>', html_content)
-        
-        return html_content
+    convert_md_to_html = simple_md_to_html
+    PARSER_ID = "fallback"
 
-def md_to_html_presentation(md_content, theme="white", transition="slide", max_chars_per_slide=1500, max_paragraphs_per_slide=6, 
-                      h1_size=48, h2_size=36, body_size=24):
+# Elements whose content must not be collapsed like ordinary markup
+_PROTECTED_PATTERN = re.compile(r'(<pre\b.*?</pre>|<script\b[^>]*>.*?</script>|<style\b[^>]*>.*?</style>)',
+                                re.DOTALL | re.IGNORECASE)
+# Block-level tags around which whitespace carries no meaning
+_BLOCK_TAG_PATTERN = re.compile(r'\s*(</?(?:!doctype|html|head|body|meta|link|title|div|section|p|ul|ol|li|table|thead|tbody|tr|th|td|'
+                                r'h[1-6]|blockquote|hr|br)\b[^>]*>)\s*', re.IGNORECASE)
+
+def _minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def _minify_js(js):
+    """Drop comment-only lines and indentation from an inline script (line breaks are kept)"""
+    lines = [line.strip() for line in js.split('\n')]
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def minify_html(html_content):
     """
-    Convert markdown content to HTML presentation format using reveal.js
-    Split long content into vertical slides
+    Collapse whitespace in HTML markup
+    <pre> content is kept verbatim, inline CSS and scripts are compacted separately
     """
-    # Convert markdown to HTML
-    html_content = convert_md_to_html(md_content)
-    
-    # Split the HTML content by heading tags to create slides
-    # First, add markers to the headings to facilitate splitting
-    marked_content = re.sub(r'<h1[^>]*>(.*?)</h1>', r'%%%SLIDE%%%<h1>\1</h1>', html_content)
-    marked_content = re.sub(r'<h2[^>]*>(.*?)</h2>', r'%%%SLIDE%%%<h2>\1</h2>', marked_content)
-    
-    # Split by the marker
-    slides = marked_content.split('%%%SLIDE%%%')
-    
-    # Remove empty first slide if needed
-    if slides[0].strip() == '':
-        slides.pop(0)
-    else:
-        # If there's content before the first heading, make it an intro slide
-        slides[0] = f'<h1>소개</h1>{slides[0]}'
-    
-    # Create the slides HTML with subslides for long content
-    slides_html = ""
-    for slide in slides:
-        if not slide.strip():  # Skip empty slides
-            continue
-            
-        # Extract the heading to be repeated across vertical slides
-        heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', slide)
-        heading = heading_match.group(0) if heading_match else '<h2>슬라이드</h2>'
-        
-        # Handle long slides by splitting them into vertical slides
-        content_parts = []
-        
-        # Extract paragraph-like elements and blocks
-        heading_pattern = r'<h[1-6][^>]*>.*?</h[1-6]>'
-        paragraph_pattern = r'<p>.*?</p>'
-        list_pattern = r'<[ou]l>.*?</[ou]l>'
-        table_pattern = r'<table>.*?</table>'
-        pre_pattern = r'<pre>.*?</pre>'
-        
-        # Get rid of the heading for content processing
-        content_without_heading = re.sub(heading_pattern, '', slide, count=1)
-        
-        # Find all blocks: paragraphs, lists, tables, code blocks
-        blocks = []
-        # Find all paragraph blocks
-        blocks.extend(re.findall(paragraph_pattern, content_without_heading, re.DOTALL))
-        # Find all list blocks
-        blocks.extend(re.findall(list_pattern, content_without_heading, re.DOTALL))
-        # Find all table blocks
-        blocks.extend(re.findall(table_pattern, content_without_heading, re.DOTALL))
-        # Find all code blocks
-        blocks.extend(re.findall(pre_pattern, content_without_heading, re.DOTALL))
-        
-        # If we couldn't properly split it into blocks, just use the whole content
-        if not blocks:
-            blocks = [content_without_heading]
-        
-        # Initialize with the heading
-        current_part = heading
-        current_size = len(heading)
-        current_paragraphs = 0
-        
-        # Distribute blocks across slides
-        for block in blocks:
-            block_size = len(block)
-            
-            # Check if adding this block would exceed our limits
-            if (current_size + block_size > max_chars_per_slide or 
-                current_paragraphs >= max_paragraphs_per_slide) and current_size > len(heading):
-                # Save current part and start a new one with the heading
-                content_parts.append(current_part)
-                current_part = heading
-                current_size = len(heading)
-                current_paragraphs = 0
-            
-            # Add the block to the current part
-            current_part += block
-            current_size += block_size
-            current_paragraphs += 1
-        
-        # Add the last part if it has content beyond just the heading
-        if current_size > len(heading):
-            content_parts.append(current_part)
-        
-        # If we have multiple parts, create vertical slides
-        if len(content_parts) > 1:
-            slides_html += '<section>'
-            for part in content_parts:
-                slides_html += f'<section>{part}</section>'
-            slides_html += '</section>'
-        else:
-            # Single slide, no need for vertical slides
-            slides_html += f'<section>{slide}</section>'
-    
-    # Create the complete HTML presentation
-    presentation_html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Presentation</title>
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reset.css">
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.css">
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/theme/{theme}.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/default.min.css">
-        <style>
+    parts = _PROTECTED_PATTERN.split(html_content)
+    minified = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            # Ordinary markup
+            part = re.sub(r'<!--(?!\[).*?-->', '', part, flags=re.DOTALL)
+            part = re.sub(r'\s+', ' ', part)
+            part = _BLOCK_TAG_PATTERN.sub(r'\1', part)
+            # Protected elements are block-level too
+            if i > 0:
+                part = part.lstrip()
+            if i < len(parts) - 1:
+                part = part.rstrip()
+        elif part[:6].lower() == '<style':
+            open_end = part.index('>') + 1
+            close_start = part.lower().rindex('</style')
+            part = part[:open_end] + _minify_css(part[open_end:close_start]) + part[close_start:]
+        elif part[:7].lower() == '<script':
+            open_end = part.index('>') + 1
+            close_start = part.lower().rindex('</script')
+            part = part[:open_end] + _minify_js(part[open_end:close_start]) + part[close_start:]
+        minified.append(part)
+    
+    return ''.join(minified)
+
+def minify_html_stream(chunks, stats=None):
+    """
+    Minify an iterable of HTML chunks, yielding each chunk as soon as it is compacted
+    Chunks must not split a <pre>, <style> or <script> element.
+    If a stats dict is given, original_size/minified_size (UTF-8 bytes) and elapsed_ms are accumulated in it
+    """
+    if stats is not None:
+        stats.setdefault("original_size", 0)
+        stats.setdefault("minified_size", 0)
+        stats.setdefault("elapsed_ms", 0.0)
+    
+    for chunk in chunks:
+        started = time.perf_counter()
+        minified = minify_html(chunk)
+        if stats is not None:
+            stats["elapsed_ms"] += (time.perf_counter() - started) * 1000
+            stats["original_size"] += len(chunk.encode())
+            stats["minified_size"] += len(minified.encode())
+        yield minified
+
+def presentation_css(h1_size=48, h2_size=36, body_size=24):
+    """Stylesheet of the presentation (layout and font sizes on top of the reveal.js theme)"""
+    return f"""
             .reveal section {{
                 text-align: left;
                 height: 100%;
@@ -299,17 +282,39 @@ def md_to_html_presentation(md_content, theme="white", transition="slide", max_c
                 padding: 0.5em;
                 border: 1px solid #ccc;
             }}
-        </style>
+        """
+
+def _presentation_head(theme, h1_size, h2_size, body_size, stylesheet_href=None, title="Presentation"):
+    """
+    Document head and opening markup of the reveal.js presentation, up to the slides
+    The stylesheet is embedded unless stylesheet_href points to a shared copy of it
+    """
+    if stylesheet_href:
+        style_html = f'<link rel="stylesheet" href="{stylesheet_href}">'
+    else:
+        style_html = f'<style>{presentation_css(h1_size, h2_size, body_size)}</style>'
+    
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>
+        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reset.css">
+        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.css">
+        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/theme/{theme}.css">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/default.min.css">
+        {style_html}
     </head>
     <body>
         <div class="reveal">
             <div class="slides">
-                {slides_html}
-            </div>
-        </div>
-        <script src="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/highlight.min.js"></script>
-        <script>
+                """
+
+def presentation_script(transition="slide"):
+    """Script that initializes reveal.js and syntax highlighting"""
+    return f"""
             Reveal.initialize({{
                 hash: true,
                 slideNumber: true,
@@ -334,228 +339,33 @@ def md_to_html_presentation(md_content, theme="white", transition="slide", max_c
             document.querySelectorAll('pre code').forEach((block) => {{
                 hljs.highlightBlock(block);
             }});
-        </script>
+        """
+
+def _presentation_tail(transition, script_src=None, nav_html=""):
+    """
+    Closing markup of the reveal.js presentation, including the initialization script
+    The script is embedded unless script_src points to a shared copy of it
+    """
+    if script_src:
+        script_html = f'<script src="{script_src}"></script>'
+    else:
+        script_html = f'<script>{presentation_script(transition)}</script>'
+    
+    return f"""
+            </div>
+        </div>{nav_html}
+        <script src="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.js"></script>
+        <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/highlight.min.js"></script>
+        {script_html}
     </body>
     </html>
     """
-    
-    return presentation_html
-
-def get_download_link(content, filename, text):
-    """Generate a download link for the file content"""
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:file/html;base64,{b64}" download="{filename}" class="download-btn">{text}</a>'
-    return href
-
-def extract_slide_titles(html_content):
-    """Extract slide titles from the HTML content"""
-    # 정규식으로 슬라이드 섹션 추출
-    section_pattern = r'<section>(.*?)</section>'
-    all_sections = re.findall(section_pattern, html_content, re.DOTALL)
-    
-    titles = []
-    for section in all_sections:
-        # 중첩된 섹션인지 확인 (수직 슬라이드가 있는지)
-        nested_sections = re.findall(r'<section>(.*?)</section>', section, re.DOTALL)
-        
-        # 중첩 슬라이드가 있으면
-        if nested_sections and len(nested_sections) > 0:
-            # 첫 번째 중첩 슬라이드에서 제목 추출
-            heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', nested_sections[0])
-            if heading_match:
-                title = heading_match.group(1)
-                titles.append(title)
-                # 하위 슬라이드 수 표시
-                slide_count = len(nested_sections)
-                if slide_count > 1:
-                    titles[-1] += f" ({slide_count}페이지)"
-        else:
-            # 단일 슬라이드에서 제목 추출
-            heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', section)
-            if heading_match:
-                titles.append(heading_match.group(1))
-    
-    return titles
-
-def main():
-    st.set_page_config(page_title="MD to HTML Presentation Converter", 
-                       page_icon="📊", 
-                       layout="wide")
-    
-    st.title("마크다운 프레젠테이션 변환기")
-    st.subheader("AI로 받은 보고서를 프레젠테이션으로 변환하세요")
-    
-    with st.expander("사용 방법", expanded=True):
-        st.markdown("""
-        1. **마크다운 파일 업로드 또는 텍스트 입력**: `.md` 확장자의 마크다운 파일을 업로드하거나 직접 마크다운 텍스트를 입력하세요
-        2. **변환**: 내용이 자동으로 HTML 프레젠테이션 형식으로 변환됩니다
-        3. **미리보기**: 변환된 프레젠테이션을 미리 볼 수 있습니다
-        4. **다운로드**: HTML 파일을 다운로드하여 브라우저에서 열 수 있습니다
-        
-        **참고**: 최상의 결과를 위해 마크다운 내용은 `#` 또는 `##` 제목으로 구조화되어 있어야 합니다. 각 제목은 새로운 슬라이드가 됩니다.
-        """)
-    
-    # Add tabs for file upload and text input
-    tab1, tab2 = st.tabs(["파일 업로드", "텍스트 입력"])
-    
-    # Variables to store the content and filename
-    md_content = None
-    file_name = "presentation.html"
-    
-    with tab1:
-        uploaded_file = st.file_uploader("마크다운 파일을 업로드하세요", type=['md'])
-        if uploaded_file is not None:
-            md_content = uploaded_file.read().decode()
-            file_name = Path(uploaded_file.name).stem + "_presentation.html"
-    
-    with tab2:
-        md_text_input = st.text_area("마크다운 텍스트를 입력하세요", height=300, 
-                                     placeholder="# 제목\n\n내용을 입력하세요...\n\n## 소제목\n\n- 항목 1\n- 항목 2")
-        if md_text_input and uploaded_file is None:
-            md_content = md_text_input
-    
-    # Theme and transition options
-    col1, col2 = st.columns(2)
-    with col1:
-        theme = st.selectbox(
-            "프레젠테이션 테마",
-            ["white", "black", "league", "beige", "sky", "night", "serif", "simple", "solarized", "moon", "dracula"]
-        )
-    with col2:
-        transition = st.selectbox(
-            "슬라이드 전환 효과",
-            ["none", "fade", "slide", "convex", "concave", "zoom"]
-        )
-        
-    # 슬라이드 분할 설정    
-    st.subheader("슬라이드 분할 설정")
-    st.info("긴 내용은 자동으로 여러 하위 슬라이드로 분할됩니다. 아래 화살표로 이동할 수 있습니다.")
-    
-    col3, col4 = st.columns(2)
-    with col3:
-        max_chars = st.slider("슬라이드당 최대 글자 수", 500, 3000, 1500, 100,
-                            help="이 글자 수를 초과하면 내용이 다음 하위 슬라이드로 이동import streamlit as st
-import re
-import base64
-from pathlib import Path
 
-# Try to import markdown, but have a fallback method
-try:
-    import markdown
-    
-    def convert_md_to_html(md_content):
-        """Convert markdown to HTML using the markdown package"""
-        return markdown.markdown(md_content, extensions=['extra', 'codehilite', 'tables'])
-        
-except ImportError:
-    # Fallback simple markdown to HTML converter
-    def convert_md_to_html(md_content):
-        """Simple markdown to HTML converter as fallback"""
-        html_content = md_content
-        
-        # Convert headers
-        html_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-        html_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
-        html_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-        
-        # Handle table of contents format (numbered list with links on a single line)
-        toc_pattern = r'([0-9]+)\. \[(.*?)\]\((.*?)\)'
-        if re.search(toc_pattern, html_content):
-            # If contents is detected, put each item on a new line before processing
-            content_with_breaks = ""
-            for line in html_content.split('\n'):
-                if re.search(toc_pattern, line):
-                    # Separate numbered list items
-                    items = re.findall(r'([0-9]+)\. \[(.*?)\]\((.*?)\)', line)
-                    if items:
-                        for item in items:
-                            content_with_breaks += f"{item[0]}. [{item[1]}]({item[2]})\n"
-                        content_with_breaks += "\n"
-                    else:
-                        content_with_breaks += line + "\n"
-                else:
-                    content_with_breaks += line + "\n"
-            
-            html_content = content_with_breaks
-        
-        # Convert numbered lists (must come before regular paragraph conversion)
-        list_items = []
-        in_list = False
-        
-        new_content = []
-        for line in html_content.split('\n'):
-            # Match numbered list pattern
-            match = re.match(r'([0-9]+)\. (.*?)', line)
-            if match:
-                if not in_list:
-                    new_content.append('<ol>')
-                    in_list = True
-                # Convert any markdown links in list items
-                item_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', match.group(2))
-                new_content.append(f'<li>{item_content}</li>')
-            else:
-                if in_list:
-                    new_content.append('</ol>')
-                    in_list = False
-                new_content.append(line)
-        
-        if in_list:
-            new_content.append('</ol>')
-            
-        html_content = '\n'.join(new_content)
-        
-        # Convert links (that aren't already converted in lists)
-        html_content = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html_content)
-        
-        # Convert paragraphs (lines followed by blank lines)
-        html_content = re.sub(r'([^\n]+)\n\n', r'<p>\1</p>\n\n', html_content)
-        
-        # Convert bold
-        html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
-        
-        # Convert italic
-        html_content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html_content)
-        
-        # Convert unordered lists
-        list_items = []
-        in_list = False
-        
-        new_content = []
-        for line in html_content.split('\n'):
-            match = re.match(r'- (.*?)', line)
-            if match:
-                if not in_list:
-                    new_content.append('<ul>')
-                    in_list = True
-                new_content.append(f'<li>{match.group(1)}</li>')
-            else:
-                if in_list:
-                    new_content.append('</ul>')
-                    in_list = False
-                new_content.append(line)
-        
-        if in_list:
-            new_content.append('</ul>')
-            
-        html_content = '\n'.join(new_content)
-        
-        # Convert code blocks
-        html_content = re.sub(r'```(.*?)```', r'<pre><code>\1</code></pre>', html_content, flags=re.DOTALL)
-        
-        # Convert inline code
-        html_content = re.sub(r'`(.*?)`', r'<code>\1</code>', html_content)
-        
-        return html_content
-
-def md_to_html_presentation(md_content, theme="white", transition="slide", max_chars_per_slide=1500, max_paragraphs_per_slide=6, 
-                      h1_size=48, h2_size=36, body_size=24):
+def split_slides(html_content):
     """
-    Convert markdown content to HTML presentation format using reveal.js
-    Split long content into vertical slides
+    Split converted HTML into slides at h1/h2 headings
+    Returns a list of (slide, heading, blocks) tuples, where blocks are the paragraph-like elements after the heading
     """
-    # Convert markdown to HTML
-    html_content = convert_md_to_html(md_content)
-    
     # Split the HTML content by heading tags to create slides
     # First, add markers to the headings to facilitate splitting
     marked_content = re.sub(r'<h1[^>]*>(.*?)</h1>', r'%%%SLIDE%%%<h1>\1</h1>', html_content)
@@ -571,8 +381,7 @@ def md_to_html_presentation(md_content, theme="white", transition="slide", max_c
         # If there's content before the first heading, make it an intro slide
         slides[0] = f'<h1>소개</h1>{slides[0]}'
     
-    # Create the slides HTML with subslides for long content
-    slides_html = ""
+    parsed_slides = []
     for slide in slides:
         if not slide.strip():  # Skip empty slides
             continue
@@ -581,9 +390,6 @@ def md_to_html_presentation(md_content, theme="white", transition="slide", max_c
         heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', slide)
         heading = heading_match.group(0) if heading_match else '<h2>슬라이드</h2>'
         
-        # Handle long slides by splitting them into vertical slides
-        content_parts = []
-        
         # Extract paragraph-like elements and blocks
         heading_pattern = r'<h[1-6][^>]*>.*?</h[1-6]>'
         paragraph_pattern = r'<p>.*?</p>'
@@ -609,209 +415,395 @@ def md_to_html_presentation(md_content, theme="white", transition="slide", max_c
         if not blocks:
             blocks = [content_without_heading]
         
-        # Initialize with the heading
-        current_part = heading
-        current_size = len(heading)
-        current_paragraphs = 0
-        
-        # Distribute blocks across slides
-        for block in blocks:
-            block_size = len(block)
-            
-            # Check if adding this block would exceed our limits
-            if (current_size + block_size > max_chars_per_slide or 
-                current_paragraphs >= max_paragraphs_per_slide) and current_size > len(heading):
-                # Save current part and start a new one with the heading
-                content_parts.append(current_part)
-                current_part = heading
-                current_size = len(heading)
-                current_paragraphs = 0
-            
-            # Add the block to the current part
-            current_part += block
-            current_size += block_size
-            current_paragraphs += 1
-        
-        # Add the last part if it has content beyond just the heading
-        if current_size > len(heading):
+        parsed_slides.append((slide, heading, blocks))
+    
+    return parsed_slides
+
+def parse_document(md_content):
+    """
+    Markdown converted and split into (slide, heading, blocks) triples, as split_slides returns them
+    The result does not depend on styling or pagination and is cached by content hash in this process
+    """
+    return document_cache.default_cache.get(md_content, PARSER_ID,
+                                            lambda: split_slides(convert_md_to_html(md_content)))
+
+def paginate_blocks(heading, blocks, max_chars_per_slide=1500, max_paragraphs_per_slide=6):
+    """Distribute the blocks of one slide across vertical sub-slides, each starting with the heading"""
+    content_parts = []
+    
+    # Initialize with the heading
+    current_part = heading
+    current_size = len(heading)
+    current_paragraphs = 0
+    
+    # Distribute blocks across slides
+    for block in blocks:
+        block_size = len(block)
+        
+        # Check if adding this block would exceed our limits
+        if (current_size + block_size > max_chars_per_slide or 
+            current_paragraphs >= max_paragraphs_per_slide) and current_size > len(heading):
+            # Save current part and start a new one with the heading
             content_parts.append(current_part)
+            current_part = heading
+            current_size = len(heading)
+            current_paragraphs = 0
         
-        # If we have multiple parts, create vertical slides
-        if len(content_parts) > 1:
-            slides_html += '<section>'
-            for part in content_parts:
-                slides_html += f'<section>{part}</section>'
-            slides_html += '</section>'
-        else:
-            # Single slide, no need for vertical slides
-            slides_html += f'<section>{slide}</section>'
+        # Add the block to the current part
+        current_part += block
+        current_size += block_size
+        current_paragraphs += 1
     
-    # Create the complete HTML presentation
-    presentation_html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Presentation</title>
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reset.css">
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.css">
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/theme/{theme}.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/default.min.css">
-        <style>
-            .reveal section {{
-                text-align: left;
-                height: 100%;
-                overflow: auto;
-                padding: 20px;
-            }}
-            
-            /* 한글 폰트 최적화 */
-            .reveal h1 {{
-                font-size: {h1_size}px;
-                font-weight: 600;
-                margin-bottom: 0.6em;
-                line-height: 1.2;
-            }}
-            
-            .reveal h2 {{
-                font-size: {h2_size}px;
-                font-weight: 600;
-                margin-bottom: 0.5em;
-                line-height: 1.2;
-            }}
-            
-            .reveal h3 {{
-                font-size: {int(h2_size * 0.8)}px;
-                font-weight: 600;
-                margin-bottom: 0.4em;
-            }}
-            
-            .reveal p, .reveal li, .reveal td, .reveal th {{
-                font-size: {body_size}px;
-                line-height: 1.4;
-            }}
-            
-            .reveal code {{
-                font-size: {int(body_size * 0.9)}px;
-                font-family: 'Consolas', 'Monaco', monospace;
-            }}
-            
-            /* 슬라이드 내용의 최대 크기 제한 */
-            .reveal .slides {{
-                height: 100%;
-            }}
-            
-            /* 네비게이션 화살표 스타일 */
-            .reveal .controls {{
-                bottom: 16px;
-                right: 16px;
-            }}
-            
-            /* 하위 슬라이드를 위한 아래 화살표 더 눈에 띄게 */
-            .reveal .controls .navigate-down.enabled {{
-                opacity: 0.9;
-                animation: pulse 2s infinite;
-            }}
-            
-            @keyframes pulse {{
-                0% {{ opacity: 0.5; }}
-                50% {{ opacity: 1; }}
-                100% {{ opacity: 0.5; }}
-            }}
-            .reveal ul, .reveal ol {{
-                display: block;
-            }}
-            .reveal pre {{
-                width: 100%;
-                box-shadow: none;
-                font-size: {int(body_size * 0.9)}px;
-            }}
-            .reveal table {{
-                margin: 1em 0;
-                width: 100%;
-            }}
-            .reveal th, .reveal td {{
-                padding: 0.5em;
-                border: 1px solid #ccc;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="reveal">
-            <div class="slides">
-                {slides_html}
-            </div>
-        </div>
-        <script src="https://cdn.jsdelivr.net/npm/reveal.js@4.1.0/dist/reveal.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/highlight.min.js"></script>
-        <script>
-            Reveal.initialize({{
-                hash: true,
-                slideNumber: true,
-                transition: '{transition}',
-                center: false,
-                plugins: [ ],
-                highlightConfig: {{
-                    tabReplace: '    '
-                }},
-                // 이중 슬라이드 (상하 이동) 활성화
-                navigationMode: 'default',
-                // 아래로 이동하는 화살표 표시
-                controlsLayout: 'bottom-right',
-                controlsTutorial: true,
-                // 진행 표시기 (상단에 점으로 표시)
-                progress: true,
-                // 네비게이션 도움말 표시
-                help: true
-            }});
-            
-            // Initialize syntax highlighting
-            document.querySelectorAll('pre code').forEach((block) => {{
-                hljs.highlightBlock(block);
-            }});
-        </script>
-    </body>
-    </html>
-    """
+    # Add the last part if it has content beyond just the heading
+    if current_size > len(heading):
+        content_parts.append(current_part)
     
-    return presentation_html
+    return content_parts
+
+def iter_paginated_slides(md_content, max_chars_per_slide=1500, max_paragraphs_per_slide=6):
+    """(slide, heading, content_parts) for each slide, repaginated from the cached parse"""
+    for slide, heading, blocks in parse_document(md_content):
+        yield slide, heading, paginate_blocks(heading, blocks, max_chars_per_slide, max_paragraphs_per_slide)
 
-def get_download_link(content, filename, text):
-    """Generate a download link for the file content"""
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:file/html;base64,{b64}" download="{filename}" class="download-btn">{text}</a>'
-    return href
+def _slide_title(heading, content_parts):
+    """Title of a slide as listed in the outline, with the sub-slide count if it was split"""
+    title = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', heading).group(1)
+    if len(content_parts) > 1:
+        title += f" ({len(content_parts)}페이지)"
+    return title
 
-def extract_slide_titles(html_content):
-    """Extract slide titles from the HTML content"""
-    # 정규식으로 슬라이드 섹션 추출
-    section_pattern = r'<section>(.*?)</section>'
-    all_sections = re.findall(section_pattern, html_content, re.DOTALL)
+def render_slide_section(slide, content_parts):
+    """Render one top-level <section>, nesting vertical slides when the content was split"""
+    # If we have multiple parts, create vertical slides
+    if len(content_parts) > 1:
+        section_html = '<section>'
+        for part in content_parts:
+            section_html += f'<section>{part}</section>'
+        section_html += '</section>'
+    else:
+        # Single slide, no need for vertical slides
+        section_html = f'<section>{slide}</section>'
     
-    titles = []
-    for section in all_sections:
-        # 중첩된 섹션인지 확인 (수직 슬라이드가 있는지)
-        nested_sections = re.findall(r'<section>(.*?)</section>', section, re.DOTALL)
-        
-        # 중첩 슬라이드가 있으면
-        if nested_sections and len(nested_sections) > 0:
-            # 첫 번째 중첩 슬라이드에서 제목 추출
-            heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', nested_sections[0])
-            if heading_match:
-                title = heading_match.group(1)
-                titles.append(title)
-                # 하위 슬라이드 수 표시
-                slide_count = len(nested_sections)
-                if slide_count > 1:
-                    titles[-1] += f" ({slide_count}페이지)"
-        else:
-            # 단일 슬라이드에서 제목 추출
-            heading_match = re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', section)
-            if heading_match:
-                titles.append(heading_match.group(1))
+    return section_html
+
+_FENCE_PATTERN = re.compile(r' {0,3}(`{3,}|~{3,})')
+_DEFINITION_PATTERN = re.compile(r' {0,3}(\[[^\]]+\]:|\*\[)')
+
+def split_markdown_sections(md_content):
+    """
+    Split markdown source at # and ## headings (outside ``` and ~~~ code fences)
+    Each section can be converted on its own into the slides it produces within the whole document:
+    reference link and abbreviation definitions are repeated in every section, and a document
+    with footnotes is kept whole because its footnotes are numbered and collected document-wide
+    """
+    # The regex fallback wraps headings in <p> tags that straddle slide boundaries,
+    # so its output is only correct for the document as a whole
+    if convert_md_to_html is simple_md_to_html:
+        return [md_content]
+    
+    sections = []
+    current = []
+    definitions = []
+    fence = None
+    for line in md_content.splitlines(keepends=True):
+        fence_match = _FENCE_PATTERN.match(line)
+        if fence is not None:
+            if fence_match and fence_match.group(1).startswith(fence) and not line[fence_match.end():].strip():
+                fence = None
+        elif fence_match:
+            fence = fence_match.group(1)
+        elif _DEFINITION_PATTERN.match(line):
+            if line.lstrip().startswith('[^'):
+                return [md_content]
+            definitions.append(line if line.endswith('\n') else line + '\n')
+        elif current and re.match(r'#{1,2}(?!#)', line):
+            sections.append(''.join(current))
+            current = []
+        current.append(line)
+    
+    if current:
+        sections.append(''.join(current))
+    if definitions and len(sections) > 1:
+        # Definitions apply to the whole document, so every section needs all of them
+        prefix = ''.join(definitions) + '\n'
+        sections = [prefix + section for section in sections]
+    return sections
+
+def render_markdown_section(section_md, max_chars_per_slide=1500, max_paragraphs_per_slide=6):
+    """Convert one markdown section into its top-level <section> elements"""
+    return [render_slide_section(slide, paginate_blocks(heading, blocks, max_chars_per_slide, max_paragraphs_per_slide))
+            for slide, heading, blocks in parse_document(section_md)]
+
+def wrap_presentation(slides_html, theme="white", transition="slide", h1_size=48, h2_size=36, body_size=24,
+                      stylesheet_href=None):
+    """Wrap already rendered slide sections in the reveal.js document"""
+    return (_presentation_head(theme, h1_size, h2_size, body_size, stylesheet_href) + slides_html
+            + _presentation_tail(transition))
+
+def iter_presentation_html(md_content, theme="white", transition="slide", max_chars_per_slide=1500, max_paragraphs_per_slide=6, 
+                           h1_size=48, h2_size=36, body_size=24, stylesheet_href=None, slide_titles=None):
+    """
+    Render the reveal.js presentation piece by piece
+    Yields the document head, then one top-level <section> per slide, then the closing markup
+    If a slide_titles list is given, the outline title of each slide is appended to it on the way
+    """
+    yield _presentation_head(theme, h1_size, h2_size, body_size, stylesheet_href)
+    
+    # Create the slides HTML with subslides for long content
+    for slide, heading, content_parts in iter_paginated_slides(md_content, max_chars_per_slide, max_paragraphs_per_slide):
+        if slide_titles is not None:
+            slide_titles.append(_slide_title(heading, content_parts))
+        yield render_slide_section(slide, content_parts)
+    
+    yield _presentation_tail(transition)
+
+def md_to_html_presentation(md_content, theme="white", transition="slide", max_chars_per_slide=1500, max_paragraphs_per_slide=6, 
+                      h1_size=48, h2_size=36, body_size=24, minify=False, minify_stats=None, stylesheet_href=None,
+                      slide_titles=None):
+    """
+    Convert markdown content to HTML presentation format using reveal.js
+    Split long content into vertical slides
+    If minify is set, whitespace is collapsed and size/timing figures are written to minify_stats
+    If a slide_titles list is given, the slide outline is collected into it in the same pass
+    """
+    chunks = iter_presentation_html(md_content, theme, transition, max_chars_per_slide, max_paragraphs_per_slide,
+                                    h1_size, h2_size, body_size, stylesheet_href, slide_titles)
+    if minify:
+        chunks = minify_html_stream(chunks, minify_stats)
     
-    return titles
+    return "".join(chunks)
+
+def _presentation_job(md_content, *options, stylesheet_href=None):
+    """Worker-process entry point: the presentation HTML with its minification stats and slide titles"""
+    minify_stats = {}
+    slide_titles = []
+    presentation_html = md_to_html_presentation(md_content, *options, minify_stats=minify_stats,
+                                                stylesheet_href=stylesheet_href, slide_titles=slide_titles)
+    return presentation_html, minify_stats, slide_titles
+
+def _worker_job(func_name, *args, **kwargs):
+    """Worker-process entry point: run a job of this module and report the worker's parse cache with its result"""
+    result = globals()[func_name](*args, **kwargs)
+    return result, os.getpid(), document_cache.default_cache.stats()
+
+@st.cache_resource
+def get_conversion_pool():
+    """Worker processes shared by all sessions for heavy conversions"""
+    return ConversionPool(max_workers=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                          max_queue=MAX_QUEUED_CONVERSIONS, timeout=CONVERSION_TIMEOUT_SECONDS)
+
+@st.cache_resource
+def get_artifact_store():
+    """Compressed conversion results of all sessions, within one memory budget"""
+    return ArtifactStore(max_bytes=ARTIFACT_MEMORY_BUDGET)
+
+@st.cache_resource
+def get_worker_cache_stats():
+    """Latest parse-cache figures reported by each worker process, by pid"""
+    return {}
+
+def run_in_worker(func_name, md_content, *options, **kwargs):
+    """
+    Run a conversion job of this module (such as _presentation_job) in the shared worker pool,
+    showing the queue/progress state while waiting
+    If the session reruns or disconnects meanwhile, the status update raises and the job is cancelled
+    Jobs for the same document go to the same worker where possible, so its parse cache is reused
+    """
+    status = st.empty()
+    shown = []
+    
+    def show_progress(state, elapsed):
+        message = f"변환 대기 중... ({elapsed:.0f}초)" if state == "queued" else f"변환 중... ({elapsed:.0f}초)"
+        if shown[-1:] != [message]:
+            status.info(message)
+            shown.append(message)
+    
+    pool = get_conversion_pool()
+    result, pid, cache_stats = pool.run(Path(__file__).stem, "_worker_job", func_name, md_content, *options, **kwargs,
+                                        on_wait=show_progress,
+                                        affinity=document_cache.ParsedDocumentCache.key(md_content, PARSER_ID))
+    status.empty()
+    
+    # Keep the figures of the current workers only; a restarted worker reports under a new pid
+    worker_stats = get_worker_cache_stats()
+    worker_stats.pop(pid, None)
+    worker_stats[pid] = cache_stats
+    for stale_pid in list(worker_stats)[:-pool.max_workers]:
+        worker_stats.pop(stale_pid, None)
+    return result
+
+def _hashed_asset_path(content, extension):
+    """Asset path carrying a content hash, so it can be cached indefinitely"""
+    digest = hashlib.sha256(content.encode()).hexdigest()[:10]
+    return f"assets/presentation.{digest}.{extension}"
+
+def shared_stylesheet(h1_size=48, h2_size=36, body_size=24, minify=False, extra_css=""):
+    """
+    The presentation stylesheet as a shared asset: (content-hashed path, CSS text)
+    Decks rendered with stylesheet_href set to this path link to it instead of embedding it
+    """
+    css = presentation_css(h1_size, h2_size, body_size) + extra_css
+    if minify:
+        css = _minify_css(css)
+    return _hashed_asset_path(css, "css"), css
+
+def shared_script(transition="slide", minify=False):
+    """The initialization script as a shared asset: (content-hashed path, JavaScript text)"""
+    js = presentation_script(transition)
+    if minify:
+        js = _minify_js(js)
+    return _hashed_asset_path(js, "js"), js
+
+def write_presentations_zip(fileobj, decks, shared_assets):
+    """
+    Stream presentations into a ZIP archive, one deck at a time
+    decks yields (filename, html_chunks) pairs, shared_assets maps archive paths to files stored once
+    Returns the archive names of the written decks
+    """
+    written = []
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, content in shared_assets.items():
+            archive.writestr(path, content)
+        
+        for filename, chunks in decks:
+            # 같은 이름의 파일이 여러 개면 번호를 붙인다
+            name = filename
+            stem, suffix = os.path.splitext(filename)
+            number = 2
+            while name in written:
+                name = f"{stem}_{number}{suffix}"
+                number += 1
+            
+            with archive.open(name, "w") as entry:
+                for chunk in chunks:
+                    entry.write(chunk.encode())
+            written.append(name)
+    
+    return written
+
+# 정적 사이트의 페이지 이동 링크
+SITE_NAV_CSS = """
+            .site-nav {
+                position: fixed;
+                top: 12px;
+                left: 16px;
+                z-index: 30;
+                font-size: 14px;
+            }
+            .site-nav a {
+                margin-right: 12px;
+            }
+"""
+
+def _site_page_name(index):
+    return f"slide-{index:03d}.html"
+
+def _site_index_html(titles, prefetch):
+    """
+    Lightweight table of contents for the static site
+    The index itself uses none of the shared assets, so they are prefetched for the slide pages, not preloaded
+    """
+    items = "".join(f'<li><a href="{_site_page_name(i)}">{title}</a></li>' for i, title in enumerate(titles, 1))
+    prefetch_links = "".join(f'<link rel="prefetch" href="{href}">' for href in prefetch)
+    first_page = f'<link rel="prefetch" href="{_site_page_name(1)}">' if titles else ""
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>목차</title>
+{prefetch_links}{first_page}
+<style>
+body {{ font-family: sans-serif; max-width: 720px; margin: 2em auto; padding: 0 1em; line-height: 1.6; }}
+</style>
+</head>
+<body>
+<h1>목차</h1>
+<ol>{items}</ol>
+</body>
+</html>
+"""
+
+def static_site(md_content, theme="white", transition="slide", max_chars_per_slide=1500, max_paragraphs_per_slide=6,
+                h1_size=48, h2_size=36, body_size=24, minify=False):
+    """
+    Split the presentation into a static multi-page site
+    Each top-level section becomes its own small slide-NNN.html page, and index.html lists the slide titles.
+    The stylesheet and script are shared, content-hashed files under assets/.
+    Returns (shared_assets, pages): a dict of asset path -> content and a generator of (path, html_chunks)
+    """
+    stylesheet_href, css = shared_stylesheet(h1_size, h2_size, body_size, minify, SITE_NAV_CSS)
+    script_src, js = shared_script(transition, minify)
+    shared_assets = {stylesheet_href: css, script_src: js}
+    
+    def pages():
+        slides = list(iter_paginated_slides(md_content, max_chars_per_slide, max_paragraphs_per_slide))
+        titles = []
+        for i, (slide, heading, content_parts) in enumerate(slides, 1):
+            titles.append(_slide_title(heading, content_parts))
+            page_title = re.sub(r'<[^>]+>', '', re.search(r'<h[1-2][^>]*>(.*?)</h[1-2]>', heading).group(1))
+            
+            nav_html = '<nav class="site-nav"><a href="index.html">목차</a>'
+            if i > 1:
+                nav_html += f'<a href="{_site_page_name(i - 1)}">이전</a>'
+            if i < len(slides):
+                nav_html += f'<a href="{_site_page_name(i + 1)}">다음</a><link rel="prefetch" href="{_site_page_name(i + 1)}">'
+            nav_html += '</nav>'
+            
+            page_html = (_presentation_head(theme, h1_size, h2_size, body_size, stylesheet_href,
+                                            title=page_title)
+                         + render_slide_section(slide, content_parts)
+                         + _presentation_tail(transition, script_src, nav_html))
+            yield _site_page_name(i), [minify_html(page_html) if minify else page_html]
+        
+        index_html = _site_index_html(titles, [stylesheet_href, script_src])
+        yield "index.html", [minify_html(index_html) if minify else index_html]
+    
+    return shared_assets, pages()
+
+def _static_site_job(md_content, *options):
+    """Worker-process entry point: the static site (see static_site) as ZIP archive bytes"""
+    shared_assets, pages = static_site(md_content, *options)
+    with tempfile.TemporaryFile() as archive:
+        write_presentations_zip(archive, pages, shared_assets)
+        archive.seek(0)
+        return archive.read()
+
+def export_batch_zip(uploaded_files, theme, transition, max_chars, max_paragraphs, h1_size, h2_size, body_size, minify):
+    """
+    Convert every uploaded file and stream the decks into one ZIP archive as each one finishes
+    Returns the archive bytes and the names of files skipped for being too large
+    Peak memory is one uncompressed deck during conversion plus the whole compressed archive at the end
+    """
+    stylesheet_href, css = shared_stylesheet(h1_size, h2_size, body_size, minify)
+    options = (theme, transition, max_chars, max_paragraphs, h1_size, h2_size, body_size, minify)
+    progress = st.progress(0.0)
+    skipped = []
+    
+    def rendered_decks():
+        for i, uploaded in enumerate(uploaded_files):
+            if uploaded.size > MAX_INPUT_BYTES:
+                skipped.append(uploaded.name)
+                continue
+            md_content = uploaded.getvalue().decode()
+            if len(md_content.encode()) <= INLINE_CONVERSION_BYTES:
+                chunks = iter_presentation_html(md_content, theme, transition, max_chars, max_paragraphs,
+                                                h1_size, h2_size, body_size, stylesheet_href)
+                if minify:
+                    chunks = minify_html_stream(chunks)
+            else:
+                chunks = [run_in_worker("_presentation_job", md_content, *options, stylesheet_href=stylesheet_href)[0]]
+            yield Path(uploaded.name).stem + "_presentation.html", chunks
+            progress.progress((i + 1) / len(uploaded_files))
+    
+    # 변환 중에는 덱을 하나씩 임시 파일에 압축해 기록하므로 압축 전 덱은 한 번에 하나만 메모리에 있다.
+    # 완성된 압축 파일은 download_button에 넘기기 위해 한 번 전부 읽으며, Streamlit은 다운로드가 끝날
+    # 때까지 그 바이트를 보관한다. 따라서 최종 메모리 사용량은 압축된 전체 배치 크기만큼이다.
+    with tempfile.TemporaryFile() as archive:
+        write_presentations_zip(archive, rendered_decks(), {stylesheet_href: css})
+        progress.empty()
+        archive.seek(0)
+        return archive.read(), skipped
 
 def main():
     st.set_page_config(page_title="MD to HTML Presentation Converter", 
@@ -839,8 +831,12 @@ def main():
     file_name = "presentation.html"
     
     with tab1:
-        uploaded_file = st.file_uploader("마크다운 파일을 업로드하세요", type=['md'])
-        if uploaded_file is not None:
+        uploaded_files = st.file_uploader("마크다운 파일을 업로드하세요", type=['md'], accept_multiple_files=True,
+                                          help="여러 파일을 올리면 첫 번째 파일을 미리 보고, 전체를 ZIP으로 받을 수 있습니다")
+        uploaded_file = uploaded_files[0] if uploaded_files else None
+        if uploaded_file is not None and uploaded_file.size > MAX_INPUT_BYTES:
+            st.error(f"파일이 너무 큽니다. 최대 {MAX_INPUT_BYTES // (1024 * 1024)} MB까지 변환할 수 있습니다.")
+        elif uploaded_file is not None:
             md_content = uploaded_file.read().decode()
             file_name = Path(uploaded_file.name).stem + "_presentation.html"
     
@@ -870,4 +866,148 @@ def main():
     col3, col4 = st.columns(2)
     with col3:
         max_chars = st.slider("슬라이드당 최대 글자 수", 500, 3000, 1500, 100,
-                            help="이 글자 수를 초과하면 내용이 다음 하위 슬라이드로 이동
+                              help="이 글자 수를 초과하면 내용이 다음 하위 슬라이드로 이동합니다")
+    with col4:
+        max_paragraphs = st.slider("슬라이드당 최대 단락 수", 2, 15, 6, 1,
+                                   help="이 단락 수를 초과하면 내용이 다음 하위 슬라이드로 이동합니다")
+    
+    # 글꼴 크기 설정
+    st.subheader("글꼴 크기 설정")
+    col5, col6, col7 = st.columns(3)
+    with col5:
+        h1_size = st.slider("제목(h1) 크기", 24, 72, 48, 2)
+    with col6:
+        h2_size = st.slider("소제목(h2) 크기", 20, 60, 36, 2)
+    with col7:
+        body_size = st.slider("본문 크기", 14, 36, 24, 1)
+    
+    minify = st.checkbox("HTML 압축 (공백 제거)", value=False,
+                         help="들여쓰기와 불필요한 공백을 제거해 파일 크기를 줄입니다. 코드 블록은 그대로 유지됩니다")
+    
+    # 여러 파일 일괄 변환
+    if len(uploaded_files or []) > 1:
+        st.subheader("일괄 변환")
+        st.write(f"업로드한 파일 {len(uploaded_files)}개를 각각 프레젠테이션으로 변환해 ZIP 파일로 받을 수 있습니다. "
+                 "공통 스타일시트는 압축 파일의 assets 폴더에 한 번만 저장됩니다.")
+        if st.button("ZIP으로 모두 변환"):
+            try:
+                archive_bytes, skipped = export_batch_zip(uploaded_files, theme, transition, max_chars, max_paragraphs,
+                                                          h1_size, h2_size, body_size, minify)
+            except ConversionError as e:
+                st.error(f"일괄 변환 중 오류가 발생했습니다: {e}")
+            else:
+                if skipped:
+                    st.warning("너무 커서 건너뛴 파일: " + ", ".join(skipped))
+                st.download_button("ZIP 다운로드", data=archive_bytes, file_name="presentations.zip",
+                                   mime="application/zip")
+    
+    if md_content and len(md_content.encode()) > MAX_INPUT_BYTES:
+        st.error(f"내용이 너무 깁니다. 최대 {MAX_INPUT_BYTES // (1024 * 1024)} MB까지 변환할 수 있습니다.")
+        md_content = None
+    
+    # 변환 결과는 세션별로 압축해 한 번만 보관하고, 미리보기나 다운로드할 때만 압축을 푼다
+    artifact_store = get_artifact_store()
+    session_id = st.session_state.setdefault("artifact_session_id", uuid.uuid4().hex)
+    
+    if md_content:
+        options = (theme, transition, max_chars, max_paragraphs, h1_size, h2_size, body_size, minify)
+        fingerprint = hashlib.sha256(f"{options!r}\0{md_content}".encode()).hexdigest()
+        artifact = artifact_store.metadata(session_id, "presentation")
+        if artifact is None or artifact["fingerprint"] != fingerprint:
+            # Convert markdown to presentation; large inputs go to the worker processes
+            try:
+                if len(md_content.encode()) <= INLINE_CONVERSION_BYTES:
+                    presentation_html, minify_stats, slide_titles = _presentation_job(md_content, *options)
+                else:
+                    presentation_html, minify_stats, slide_titles = run_in_worker("_presentation_job", md_content, *options)
+            except ConversionQueueFull:
+                st.warning("현재 변환 요청이 많습니다. 잠시 후 다시 시도하세요.")
+                return
+            except ConversionTimeout:
+                st.error(f"변환 시간이 {CONVERSION_TIMEOUT_SECONDS}초를 초과했습니다. 파일을 나누어 변환해 보세요.")
+                return
+            except ConversionError as e:
+                st.error(f"변환 중 오류가 발생했습니다: {e}")
+                return
+            
+            artifact = {"fingerprint": fingerprint, "minify_stats": minify_stats, "slide_titles": slide_titles}
+            artifact_store.put(session_id, "presentation", presentation_html, **artifact)
+            del presentation_html
+        minify_stats, slide_titles = artifact["minify_stats"], artifact["slide_titles"]
+        
+        if minify:
+            saved = 1 - minify_stats["minified_size"] / max(minify_stats["original_size"], 1)
+            st.caption(f"압축 결과: {minify_stats['original_size'] / 1024:.1f} KB → "
+                       f"{minify_stats['minified_size'] / 1024:.1f} KB ({saved:.0%} 감소, {minify_stats['elapsed_ms']:.1f} ms)")
+        
+        # 슬라이드 목록 표시
+        with st.expander(f"슬라이드 목록 ({len(slide_titles)}개)", expanded=False):
+            for i, title in enumerate(slide_titles, 1):
+                st.write(f"{i}. {title}")
+        
+        # Preview
+        st.subheader("미리보기")
+        if st.checkbox("미리보기 표시", value=True):
+            presentation_html = artifact_store.get(session_id, "presentation")
+            if presentation_html is None:
+                st.warning(ARTIFACT_EVICTED_MESSAGE)
+            else:
+                st.components.v1.html(presentation_html, height=600, scrolling=True)
+                del presentation_html
+        
+        # Download
+        if st.button("HTML 파일 준비", help="변환 결과의 압축을 풀어 다운로드 버튼을 만듭니다"):
+            presentation_html = artifact_store.get(session_id, "presentation")
+            if presentation_html is None:
+                st.warning(ARTIFACT_EVICTED_MESSAGE)
+            else:
+                st.download_button("HTML 프레젠테이션 다운로드", data=presentation_html.encode(), file_name=file_name,
+                                   mime="text/html")
+        
+        # 정적 사이트 내보내기
+        if st.button("정적 사이트로 내보내기 (ZIP)",
+                     help="슬라이드마다 작은 페이지를 만들고, 스타일과 스크립트는 공유 파일로 한 번만 저장합니다"):
+            # 큰 문서는 화면 변환과 마찬가지로 워커 프로세스에서 시간 제한을 두고 만든다
+            try:
+                if len(md_content.encode()) <= INLINE_CONVERSION_BYTES:
+                    site_zip = _static_site_job(md_content, *options)
+                else:
+                    site_zip = run_in_worker("_static_site_job", md_content, *options)
+            except ConversionError as e:
+                st.error(f"정적 사이트를 만드는 중 오류가 발생했습니다: {e}")
+            else:
+                st.download_button("사이트 ZIP 다운로드", data=site_zip,
+                                   file_name=Path(file_name).stem + "_site.zip", mime="application/zip")
+    else:
+        st.info("마크다운 파일을 업로드하거나 텍스트를 입력하면 프레젠테이션이 생성됩니다.")
+        artifact_store.drop_session(session_id)
+    
+    # 서버 상태 (변환 워커 큐, 캐시, 세션 메모리)
+    with st.expander("서버 상태", expanded=False):
+        pool_stats = get_conversion_pool().stats()
+        col_a, col_b, col_c, col_d = st.columns(4)
+        col_a.metric("실행 중", f"{pool_stats['running']} / {pool_stats['workers']}")
+        col_b.metric("대기 중", f"{pool_stats['queued']} / {pool_stats['max_queue']}")
+        col_c.metric("평균 대기", f"{pool_stats['wait_avg_ms']:.0f} ms")
+        col_d.metric("p95 대기", f"{pool_stats['wait_p95_ms']:.0f} ms")
+        st.caption(f"완료 {pool_stats['completed']} · 거부 {pool_stats['rejected']} · 시간 초과 {pool_stats['timed_out']} · "
+                   f"취소 {pool_stats['cancelled']} · 실패 {pool_stats['failed']}")
+        cache_stats = document_cache.default_cache.stats()
+        st.caption(f"파싱 캐시 (서버 프로세스): {cache_stats['entries']}개 문서, {cache_stats['bytes'] / 1024:.0f} KB · "
+                   f"적중 {cache_stats['hits']} · 미스 {cache_stats['misses']}")
+        worker_reports = list(get_worker_cache_stats().values())
+        if worker_reports:
+            st.caption(f"파싱 캐시 (워커 {len(worker_reports)}개): "
+                       f"{sum(report['entries'] for report in worker_reports)}개 문서, "
+                       f"{sum(report['bytes'] for report in worker_reports) / 1024:.0f} KB · "
+                       f"적중 {sum(report['hits'] for report in worker_reports)} · "
+                       f"미스 {sum(report['misses'] for report in worker_reports)}")
+        store_stats = artifact_store.stats()
+        session_usage = artifact_store.session_usage(session_id)
+        st.caption(f"세션 저장소: {store_stats['sessions']}개 세션, {store_stats['stored_bytes'] / (1024 * 1024):.1f} / "
+                   f"{store_stats['max_bytes'] / (1024 * 1024):.0f} MB · 정리된 세션 {store_stats['evictions']}")
+        st.caption(f"이 세션: {session_usage['stored_bytes'] / 1024:.0f} KB 보관 중 "
+                   f"(압축 전 {session_usage['raw_bytes'] / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
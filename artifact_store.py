@@ -0,0 +1,94 @@
+"""
+Compressed per-session artifact storage
+
+Each Streamlit session keeps its generated artifacts (the presentation HTML) here once,
+zlib-compressed, and decompresses them only when they are previewed or downloaded.
+All sessions share one memory budget; when it is exceeded, the artifacts of the least
+recently used other sessions are evicted and simply regenerated if that session returns.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+
+class ArtifactStore:
+    """Session -> name -> compressed artifact, with least-recently-used eviction across sessions"""
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, compression_level=6):
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        # session id -> {name: (compressed bytes, raw size, metadata)}, least recently used first
+        self._sessions = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _touch(self, session_id):
+        self._sessions.move_to_end(session_id)
+
+    def put(self, session_id, name, content, **metadata):
+        """Store a text artifact for a session, replacing any previous one of the same name"""
+        raw = content.encode()
+        blob = zlib.compress(raw, self.compression_level)
+        with self._lock:
+            artifacts = self._sessions.setdefault(session_id, {})
+            previous = artifacts.get(name)
+            if previous is not None:
+                self._size -= len(previous[0])
+            artifacts[name] = (blob, len(raw), metadata)
+            self._size += len(blob)
+            self._touch(session_id)
+            self._evict(keep=session_id)
+
+    def _evict(self, keep):
+        """Drop whole idle sessions, oldest first, until the store fits its budget"""
+        for session_id in list(self._sessions):
+            if self._size <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            for blob, _, _ in self._sessions.pop(session_id).values():
+                self._size -= len(blob)
+            self.evictions += 1
+
+    def metadata(self, session_id, name):
+        """Metadata stored with an artifact, or None if it is missing or was evicted"""
+        with self._lock:
+            artifact = self._sessions.get(session_id, {}).get(name)
+            if artifact is None:
+                return None
+            self._touch(session_id)
+            return artifact[2]
+
+    def get(self, session_id, name):
+        """Decompressed artifact text, or None if it is missing or was evicted"""
+        with self._lock:
+            artifact = self._sessions.get(session_id, {}).get(name)
+            if artifact is None:
+                return None
+            self._touch(session_id)
+        return zlib.decompress(artifact[0]).decode()
+
+    def drop_session(self, session_id):
+        with self._lock:
+            for blob, _, _ in self._sessions.pop(session_id, {}).values():
+                self._size -= len(blob)
+
+    def session_usage(self, session_id):
+        """Compressed and original size of one session's artifacts"""
+        with self._lock:
+            artifacts = self._sessions.get(session_id, {}).values()
+            return {
+                "artifacts": len(artifacts),
+                "stored_bytes": sum(len(blob) for blob, _, _ in artifacts),
+                "raw_bytes": sum(raw_size for _, raw_size, _ in artifacts),
+            }
+
+    def stats(self):
+        """Store-wide figures for the instrumentation panel"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "stored_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,219 @@
+"""
+Bounded worker-process pool for heavy conversions
+
+Conversions run in separate processes so a large upload does not hold the GIL of the
+Streamlit server. The pool admits at most max_workers running and max_queue waiting
+jobs, enforces a per-job time limit, and kills the worker of a job that is abandoned
+(for example when the Streamlit session reruns or disconnects while it waits).
+Jobs can name an affinity key (such as a document hash); an idle worker that recently ran
+the same key is preferred, then the most recently used one, so per-process caches stay warm.
+"""
+import importlib
+import multiprocessing
+import threading
+import time
+from collections import Counter, deque
+
+class ConversionError(Exception):
+    """A conversion failed inside the worker process"""
+
+class ConversionQueueFull(ConversionError):
+    """The pool is saturated and does not accept more jobs"""
+
+class ConversionTimeout(ConversionError):
+    """A conversion ran longer than the pool's time limit"""
+
+def _worker_main(conn):
+    """Worker process loop: run (module, function, args, kwargs) jobs and send back the result"""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        module_name, func_name, args, kwargs = message
+        try:
+            func = getattr(importlib.import_module(module_name), func_name)
+            conn.send((True, func(*args, **kwargs)))
+        except Exception as exc:
+            conn.send((False, f"{type(exc).__name__}: {exc}"))
+
+class _Worker:
+    """One persistent worker process and the pipe to it"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        # Affinity keys of the latest jobs, whose cached data this process probably still holds
+        self.recent_keys = deque(maxlen=8)
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        self.conn.close()
+
+class ConversionPool:
+    """
+    Run module-level functions in a bounded set of worker processes
+    run() blocks the calling thread; on_wait(state, elapsed_seconds) is called while the job
+    is "queued" or "running", and any exception it raises abandons the job.
+    """
+
+    def __init__(self, max_workers=2, max_queue=8, timeout=60.0, start_method="spawn", wait_samples=200):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        # Idle slots, least recently used first; None means the worker process has not been started (or was killed)
+        self._idle = [None] * max_workers
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._queued = 0
+        self._running = 0
+        self._wait_times = deque(maxlen=wait_samples)
+        self._counts = Counter()
+
+    def _take_idle(self, affinity):
+        """Remove and return the idle slot best suited to a job; the caller holds the lock"""
+        if affinity is not None:
+            for index in range(len(self._idle) - 1, -1, -1):
+                worker = self._idle[index]
+                if worker is not None and affinity in worker.recent_keys:
+                    return self._idle.pop(index)
+        return self._idle.pop()
+
+    def _release(self, worker):
+        with self._released:
+            if worker is None:
+                self._idle.insert(0, None)
+            else:
+                self._idle.append(worker)
+            self._released.notify()
+
+    def _acquire(self, on_wait, poll_interval, affinity=None):
+        """Wait for an idle worker slot, returning (slot, seconds waited)"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise ConversionQueueFull(f"{self._queued} conversions are already waiting")
+            self._queued += 1
+
+        enqueued = time.monotonic()
+        try:
+            while True:
+                with self._released:
+                    if not self._idle:
+                        self._released.wait(poll_interval)
+                    if self._idle:
+                        slot = self._take_idle(affinity)
+                        break
+                if on_wait is not None:
+                    on_wait("queued", time.monotonic() - enqueued)
+        except BaseException:
+            self._count("cancelled")
+            raise
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+        return slot, time.monotonic() - enqueued
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def run(self, module_name, func_name, *args, on_wait=None, poll_interval=0.1, affinity=None, **kwargs):
+        """
+        Run module_name.func_name(*args, **kwargs) in a worker process and return its result
+        affinity (any hashable) routes repeated jobs with the same key to the same worker when it is idle
+        """
+        worker, waited = self._acquire(on_wait, poll_interval, affinity)
+        with self._lock:
+            self._running += 1
+            self._wait_times.append(waited)
+
+        finished = False
+        try:
+            if worker is None or not worker.is_alive():
+                worker = _Worker(self._context)
+            worker.conn.send((module_name, func_name, args, kwargs))
+
+            started = time.monotonic()
+            while not worker.conn.poll(poll_interval):
+                elapsed = time.monotonic() - started
+                if elapsed > self.timeout:
+                    self._count("timed_out")
+                    raise ConversionTimeout(f"conversion exceeded {self.timeout:.0f} seconds")
+                if not worker.is_alive():
+                    self._count("failed")
+                    raise ConversionError("worker process exited unexpectedly")
+                if on_wait is not None:
+                    on_wait("running", elapsed)
+
+            try:
+                ok, payload = worker.conn.recv()
+            except EOFError:
+                self._count("failed")
+                raise ConversionError("worker process exited unexpectedly")
+            finished = True
+            if affinity is not None and affinity not in worker.recent_keys:
+                worker.recent_keys.append(affinity)
+        except ConversionError:
+            raise
+        except BaseException:
+            self._count("cancelled")
+            raise
+        finally:
+            if not finished and worker is not None:
+                # The job is abandoned but may still be running: stop it and start fresh next time
+                worker.kill()
+                worker = None
+            with self._lock:
+                self._running -= 1
+            self._release(worker)
+
+        if not ok:
+            self._count("failed")
+            raise ConversionError(payload)
+        self._count("completed")
+        return payload
+
+    def stats(self):
+        """Queue depth, wait-time and outcome figures for the instrumentation panel"""
+        with self._lock:
+            waits = sorted(self._wait_times)
+            counts = dict(self._counts)
+            queued, running = self._queued, self._running
+
+        def percentile(fraction):
+            return waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000 if waits else 0.0
+
+        return {
+            "workers": self.max_workers,
+            "running": running,
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "wait_avg_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+            "wait_p95_ms": percentile(0.95),
+            "wait_max_ms": waits[-1] * 1000 if waits else 0.0,
+            "completed": counts.get("completed", 0),
+            "rejected": counts.get("rejected", 0),
+            "timed_out": counts.get("timed_out", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    def close(self):
+        """Stop all idle worker processes"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            if worker is not None:
+                worker.conn.send(None)
+                worker.kill()
@@ -0,0 +1,178 @@
+"""
+Differential harness for the two markdown converters in app.py
+
+Random markdown documents are converted with the markdown package and with the
+regex fallback (simple_md_to_html), and the slide structure each path produces
+is compared: slide count, slide titles and block order. Divergent documents are
+shrunk to small reproducer files, and the throughput of both paths is reported.
+
+Usage:
+    python converter_harness.py --count 200 --seed 1 --out divergences
+"""
+import argparse
+import html
+import random
+import re
+import time
+from pathlib import Path
+
+from app import convert_md_to_html, simple_md_to_html, split_slides
+
+WORDS = ["보고서", "분석", "결과", "매출", "고객", "전략", "시장", "성장",
+         "report", "revenue", "growth", "market", "plan", "data", "team", "goal"]
+
+def _words(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+def _inline(rng):
+    """A line of text with some inline markup"""
+    text = _words(rng, 3, 10)
+    decoration = rng.random()
+    if decoration < 0.2:
+        text += f" **{_words(rng, 1, 2)}**"
+    elif decoration < 0.35:
+        text += f" *{_words(rng, 1, 2)}*"
+    elif decoration < 0.5:
+        text += f" `{rng.choice(WORDS)}`"
+    elif decoration < 0.6:
+        text += f" [{_words(rng, 1, 2)}](https://example.com/{rng.choice(WORDS)})"
+    return text
+
+def generate_document(rng, max_chunks=20):
+    """Generate a random markdown document as a list of blank-line separated chunks"""
+    chunks = []
+    for _ in range(rng.randint(1, max_chunks)):
+        kind = rng.random()
+        if kind < 0.25:
+            chunks.append("#" * rng.randint(1, 3) + " " + _words(rng, 1, 4))
+        elif kind < 0.55:
+            chunks.append("\n".join(_inline(rng) for _ in range(rng.randint(1, 3))))
+        elif kind < 0.7:
+            chunks.append("\n".join(f"- {_inline(rng)}" for _ in range(rng.randint(2, 5))))
+        elif kind < 0.85:
+            chunks.append("\n".join(f"{i}. {_inline(rng)}" for i in range(1, rng.randint(3, 6))))
+        elif kind < 0.95:
+            body = "\n".join(f"    {_words(rng, 1, 4)}" for _ in range(rng.randint(1, 4)))
+            chunks.append(f"```\n{body}\n```")
+        else:
+            rows = "\n".join(f"| {rng.choice(WORDS)} | {rng.randint(0, 999)} |" for _ in range(rng.randint(1, 3)))
+            chunks.append(f"| 항목 | 값 |\n|---|---|\n{rows}")
+    return chunks
+
+def _plain_text(fragment):
+    """Text content of an HTML fragment"""
+    return html.unescape(re.sub(r'<[^>]+>', '', fragment)).strip()
+
+def slide_structure(html_content):
+    """Slide titles and the tag of each block, in presentation order"""
+    structure = []
+    for slide, heading, blocks in split_slides(html_content):
+        kinds = []
+        for block in blocks:
+            tag_match = re.match(r'\s*<(\w+)', block)
+            kinds.append(tag_match.group(1) if tag_match else "text")
+        structure.append((_plain_text(heading), tuple(kinds)))
+    return structure
+
+def describe_divergence(md_content):
+    """Describe the first structural difference between the two paths, or None if they agree"""
+    expected = slide_structure(convert_md_to_html(md_content))
+    actual = slide_structure(simple_md_to_html(md_content))
+    if len(expected) != len(actual):
+        return f"slide count: markdown={len(expected)} fallback={len(actual)}"
+    for index, ((expected_title, expected_kinds), (actual_title, actual_kinds)) in enumerate(zip(expected, actual), 1):
+        if expected_title != actual_title:
+            return f"slide {index} title: markdown={expected_title!r} fallback={actual_title!r}"
+        if expected_kinds != actual_kinds:
+            return f"slide {index} blocks: markdown={list(expected_kinds)} fallback={list(actual_kinds)}"
+    return None
+
+def minimize(chunks):
+    """Shrink a divergent document by dropping chunks, then lines, while it still diverges"""
+    def diverges(candidate):
+        return bool(candidate) and describe_divergence("\n\n".join(candidate)) is not None
+
+    chunks = list(chunks)
+    index = 0
+    while index < len(chunks):
+        candidate = chunks[:index] + chunks[index + 1:]
+        if diverges(candidate):
+            chunks = candidate
+        else:
+            index += 1
+
+    for index in range(len(chunks)):
+        lines = chunks[index].split("\n")
+        line_index = 0
+        while line_index < len(lines) and len(lines) > 1:
+            candidate_lines = lines[:line_index] + lines[line_index + 1:]
+            candidate = chunks[:index] + ["\n".join(candidate_lines)] + chunks[index + 1:]
+            if diverges(candidate):
+                lines = candidate_lines
+                chunks = candidate
+            else:
+                line_index += 1
+
+    return "\n\n".join(chunks) + "\n"
+
+def measure_throughput(converter, documents, repeat):
+    """Converted bytes per second over all documents"""
+    total_bytes = sum(len(document.encode()) for document in documents) * repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            converter(document)
+    elapsed = time.perf_counter() - started
+    return total_bytes / max(elapsed, 1e-9)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the markdown package and the regex fallback converter")
+    parser.add_argument("--count", type=int, default=200, help="number of random documents")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--max-chunks", type=int, default=20, help="maximum blocks per document")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions for the throughput measurement")
+    parser.add_argument("--out", default="divergences", help="directory for minimized reproducers")
+    parser.add_argument("--max-reproducers", type=int, default=20, help="stop writing reproducers after this many")
+    args = parser.parse_args()
+
+    if convert_md_to_html is simple_md_to_html:
+        parser.error("the markdown package is not installed, so there is only one path to compare")
+
+    rng = random.Random(args.seed)
+    documents = [generate_document(rng, args.max_chunks) for _ in range(args.count)]
+    texts = ["\n\n".join(chunks) + "\n" for chunks in documents]
+
+    out_dir = Path(args.out)
+    reproducers = {}
+    divergent = 0
+    for doc_index, (chunks, text) in enumerate(zip(documents, texts)):
+        if describe_divergence(text) is None:
+            continue
+        divergent += 1
+        if len(reproducers) >= args.max_reproducers:
+            continue
+        reproducer = minimize(chunks)
+        if reproducer not in reproducers:
+            reproducers[reproducer] = (doc_index, describe_divergence(reproducer))
+
+    if reproducers:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        summary = []
+        for number, (reproducer, (doc_index, reason)) in enumerate(reproducers.items(), 1):
+            path = out_dir / f"divergence_{number:03d}.md"
+            path.write_text(reproducer, encoding="utf-8")
+            summary.append(f"{path.name}\tseed={args.seed} document={doc_index}\t{reason}")
+        (out_dir / "summary.txt").write_text("\n".join(summary) + "\n", encoding="utf-8")
+
+    markdown_rate = measure_throughput(convert_md_to_html, texts, args.repeat)
+    fallback_rate = measure_throughput(simple_md_to_html, texts, args.repeat)
+
+    print(f"documents: {args.count} (seed {args.seed})")
+    print(f"structural divergences: {divergent} ({divergent / max(args.count, 1):.0%})")
+    print(f"reproducers written: {len(reproducers)}" + (f" -> {out_dir}/" if reproducers else ""))
+    print(f"markdown package: {markdown_rate / 1024:.1f} KB/s")
+    print(f"regex fallback:   {fallback_rate / 1024:.1f} KB/s")
+    print(f"throughput ratio (fallback / markdown): {fallback_rate / markdown_rate:.2f}x")
+
+if __name__ == "__main__":
+    main()
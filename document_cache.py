@@ -0,0 +1,129 @@
+"""
+Cache of parsed, block-segmented documents
+
+Parsing (markdown conversion, heading split and block extraction) does not depend on
+the presentation style, so its result is cached by content hash and reused when only
+the theme, transition, font sizes or pagination change. Entries are kept as
+zlib-compressed JSON to stay small in memory. Each process has its own cache: the
+Streamlit server and every conversion worker parse and cache independently, which is
+why the worker pool routes repeated jobs for a document to the same worker. With a
+directory (watch_build --cache-dir) entries are also written to disk and reused across
+processes and runs.
+
+This lives outside app.py so the cache survives Streamlit re-executing the script.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger("document_cache")
+
+FORMAT_VERSION = 1
+
+class ParsedDocumentCache:
+    """LRU cache of serialized parse results, bounded by their compressed size"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(md_content, parser_id):
+        """Content hash of a document for one parser implementation"""
+        return hashlib.sha256(f"{FORMAT_VERSION}\0{parser_id}\0{md_content}".encode()).hexdigest()
+
+    def get(self, md_content, parser_id, parse):
+        """Return the parsed document, calling parse() only if it is not cached"""
+        key = self.key(md_content, parser_id)
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+
+        if blob is not None:
+            with self._lock:
+                self.hits += 1
+            return json.loads(zlib.decompress(blob))
+
+        # The disk copy is best-effort: unreadable or corrupt entries are parsed again
+        blob = self._read_file(key)
+        if blob is not None:
+            try:
+                parsed = json.loads(zlib.decompress(blob))
+            except (zlib.error, ValueError) as e:
+                logger.warning("ignoring corrupt cache entry %s (%s)", self._path(key), e)
+            else:
+                self._store(key, blob)
+                with self._lock:
+                    self.hits += 1
+                return parsed
+
+        with self._lock:
+            self.misses += 1
+        parsed = parse()
+        blob = zlib.compress(json.dumps(parsed, ensure_ascii=False, separators=(",", ":")).encode())
+        self._write_file(key, blob)
+        self._store(key, blob)
+        return parsed
+
+    def _store(self, key, blob):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = blob
+            self._size += len(blob)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _path(self, key):
+        return Path(self.directory) / key[:2] / f"{key}.json.z"
+
+    def _read_file(self, key):
+        if self.directory is None:
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_file(self, key, blob):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            # A cache that cannot be written only costs a reparse later
+            logger.warning("could not write cache entry %s (%s)", path, e)
+            if tmp_name is not None and os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+    def stats(self):
+        """Entry count, compressed size and hit/miss counts"""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+# Process-wide cache used by app.parse_document
+default_cache = ParsedDocumentCache()
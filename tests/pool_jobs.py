@@ -0,0 +1,13 @@
+"""Jobs run by the worker processes in test_conversion_pool"""
+import os
+import time
+
+def pid(delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+def fail(message):
+    raise ValueError(message)
+
+def crash():
+    os._exit(1)
@@ -0,0 +1,57 @@
+import os
+
+from artifact_store import ArtifactStore
+
+def incompressible(size):
+    return os.urandom(size // 2).hex()
+
+def test_artifacts_round_trip_compressed():
+    store = ArtifactStore()
+    content = "<section>슬라이드</section>" * 1000
+    store.put("s1", "presentation", content, fingerprint="f")
+    assert store.get("s1", "presentation") == content
+    assert store.metadata("s1", "presentation") == {"fingerprint": "f"}
+    usage = store.session_usage("s1")
+    assert usage["raw_bytes"] == len(content.encode())
+    assert usage["stored_bytes"] < usage["raw_bytes"]
+
+def test_replacing_an_artifact_updates_the_size():
+    store = ArtifactStore()
+    store.put("s1", "presentation", incompressible(10_000))
+    store.put("s1", "presentation", "small")
+    assert store.stats()["stored_bytes"] == store.session_usage("s1")["stored_bytes"]
+    assert store.get("s1", "presentation") == "small"
+
+def test_least_recently_used_sessions_are_evicted_first():
+    store = ArtifactStore()
+    for session_id in ("s1", "s2"):
+        store.put(session_id, "presentation", incompressible(10_000))
+    # Room for two of the three sessions' artifacts
+    store.max_bytes = store.stats()["stored_bytes"] * 5 // 4 + 1
+    # Reading s1 makes s2 the least recently used session
+    assert store.get("s1", "presentation") is not None
+    store.put("s3", "presentation", incompressible(10_000))
+
+    assert store.get("s2", "presentation") is None
+    assert store.metadata("s2", "presentation") is None
+    assert store.get("s1", "presentation") is not None
+    assert store.get("s3", "presentation") is not None
+    stats = store.stats()
+    assert stats["evictions"] == 1
+    assert stats["stored_bytes"] <= stats["max_bytes"]
+
+def test_the_writing_session_is_never_evicted():
+    store = ArtifactStore(max_bytes=1_000)
+    store.put("s1", "presentation", incompressible(10_000))
+    assert store.get("s1", "presentation") is not None
+    store.put("s2", "presentation", incompressible(10_000))
+    assert store.get("s1", "presentation") is None
+    assert store.get("s2", "presentation") is not None
+
+def test_drop_session_frees_its_bytes():
+    store = ArtifactStore()
+    store.put("s1", "presentation", incompressible(10_000))
+    store.put("s2", "presentation", "kept")
+    store.drop_session("s1")
+    assert store.session_usage("s1") == {"artifacts": 0, "stored_bytes": 0, "raw_bytes": 0}
+    assert store.stats()["stored_bytes"] == store.session_usage("s2")["stored_bytes"]
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from conversion_pool import ConversionError, ConversionPool, ConversionQueueFull, ConversionTimeout
+
+JOBS = "pool_jobs"
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        pool = ConversionPool(**kwargs)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.close()
+
+def wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+def run_in_thread(pool, *args, **kwargs):
+    results = {}
+
+    def target():
+        try:
+            results["value"] = pool.run(JOBS, *args, **kwargs)
+        except Exception as e:
+            results["error"] = e
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, results
+
+def test_worker_is_reused_and_errors_are_reported(make_pool):
+    pool = make_pool(max_workers=1)
+    first = pool.run(JOBS, "pid")
+    with pytest.raises(ConversionError, match="ValueError: broken"):
+        pool.run(JOBS, "fail", "broken")
+    assert pool.run(JOBS, "pid") == first
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"]) == (2, 1)
+
+def test_timeout_kills_and_replaces_the_worker(make_pool):
+    pool = make_pool(max_workers=1, timeout=0.5)
+    first = pool.run(JOBS, "pid")
+    with pytest.raises(ConversionTimeout):
+        pool.run(JOBS, "pid", 30)
+    assert pool.run(JOBS, "pid") != first
+    assert pool.stats()["timed_out"] == 1
+
+def test_crashed_worker_is_replaced(make_pool):
+    pool = make_pool(max_workers=1)
+    first = pool.run(JOBS, "pid")
+    with pytest.raises(ConversionError, match="exited unexpectedly"):
+        pool.run(JOBS, "crash")
+    assert pool.run(JOBS, "pid") != first
+
+def test_exception_from_on_wait_cancels_the_job(make_pool):
+    class Rerun(Exception):
+        pass
+
+    def on_wait(state, elapsed):
+        if state == "running":
+            raise Rerun()
+
+    pool = make_pool(max_workers=1)
+    first = pool.run(JOBS, "pid")
+    with pytest.raises(Rerun):
+        pool.run(JOBS, "pid", 30, on_wait=on_wait)
+    # The abandoned job's worker was killed, so the slot is free again at once
+    assert pool.run(JOBS, "pid") != first
+    stats = pool.stats()
+    assert (stats["cancelled"], stats["running"], stats["queued"]) == (1, 0, 0)
+
+def test_admission_limit_rejects_beyond_the_queue(make_pool):
+    pool = make_pool(max_workers=1, max_queue=1)
+    running, running_result = run_in_thread(pool, "pid", 1.0)
+    wait_for(lambda: pool.stats()["running"] == 1)
+    queued, queued_result = run_in_thread(pool, "pid")
+    wait_for(lambda: pool.stats()["queued"] == 1)
+
+    with pytest.raises(ConversionQueueFull):
+        pool.run(JOBS, "pid")
+
+    running.join()
+    queued.join()
+    assert "value" in running_result and "value" in queued_result
+    stats = pool.stats()
+    assert (stats["rejected"], stats["completed"], stats["queued"]) == (1, 2, 0)
+
+def test_cancelled_while_queued_releases_the_queue_slot(make_pool):
+    class Gone(Exception):
+        pass
+
+    def on_wait(state, elapsed):
+        raise Gone()
+
+    pool = make_pool(max_workers=1, max_queue=1)
+    running, _ = run_in_thread(pool, "pid", 1.0)
+    wait_for(lambda: pool.stats()["running"] == 1)
+    with pytest.raises(Gone):
+        pool.run(JOBS, "pid", on_wait=on_wait)
+    assert pool.stats()["queued"] == 0
+    running.join()
+    pool.run(JOBS, "pid")
+
+def test_affinity_routes_repeat_jobs_to_the_same_worker(make_pool):
+    pool = make_pool(max_workers=3)
+    # Start all three workers at once, each with its own key
+    threads = {key: run_in_thread(pool, "pid", 0.5, affinity=key) for key in "abc"}
+    for thread, _ in threads.values():
+        thread.join()
+    pids = {key: result["value"] for key, (_, result) in threads.items()}
+    assert len(set(pids.values())) == 3
+
+    for key in "abcacb":
+        assert pool.run(JOBS, "pid", affinity=key) == pids[key]
+    # A new key goes to the most recently used worker
+    assert pool.run(JOBS, "pid", affinity="new") == pids["b"]
@@ -0,0 +1,48 @@
+import os
+
+from document_cache import ParsedDocumentCache
+
+PARSED = [["<h1>A</h1><p>x</p>", "<h1>A</h1>", ["<p>x</p>"]]]
+
+def parse_counter():
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return PARSED
+    return parse, calls
+
+def test_disk_entries_are_reused(tmp_path):
+    parse, calls = parse_counter()
+    assert ParsedDocumentCache(directory=tmp_path).get("# A\n\nx\n", "test", parse) == PARSED
+    assert ParsedDocumentCache(directory=tmp_path).get("# A\n\nx\n", "test", parse) == PARSED
+    assert len(calls) == 1
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ParsedDocumentCache(directory=tmp_path)
+    path = cache._path(cache.key("doc", "test"))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not zlib")
+    parse, calls = parse_counter()
+    assert cache.get("doc", "test", parse) == PARSED
+    assert len(calls) == 1
+    # The corrupt file was replaced with a valid entry
+    assert ParsedDocumentCache(directory=tmp_path).get("doc", "test", parse) == PARSED
+    assert len(calls) == 1
+
+def test_unwritable_directory_is_ignored(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = ParsedDocumentCache(directory=blocker / "cache")
+    parse, calls = parse_counter()
+    assert cache.get("doc", "test", parse) == PARSED
+    assert cache.get("doc", "test", parse) == PARSED
+    assert len(calls) == 1
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    def fail_replace(src, dst):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(os, "replace", fail_replace)
+    parse, calls = parse_counter()
+    assert ParsedDocumentCache(directory=tmp_path).get("doc", "test", parse) == PARSED
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
@@ -0,0 +1,31 @@
+import re
+
+from app import md_to_html_presentation, minify_html, minify_html_stream
+
+PRE = "<pre><code>def f():\n    return  1\n\n\n    # two  spaces\n</code></pre>"
+
+def test_pre_content_is_kept_verbatim():
+    html_content = f"<section>\n  <p>Some   text</p>\n  {PRE}\n  <p>More\n   text</p>\n</section>"
+    minified = minify_html(html_content)
+    assert PRE in minified
+    assert minified == f"<section><p>Some text</p>{PRE}<p>More text</p></section>"
+
+def test_pre_with_attributes_is_kept_verbatim():
+    pre = '<PRE class="x">  a\n\tb  </PRE>'
+    assert pre in minify_html(f"<div>\n {pre} \n</div>")
+
+def test_stream_keeps_pre_verbatim():
+    chunks = ["<section>\n  <h2>Code</h2>\n", f"  {PRE}\n", "</section>\n"]
+    stats = {}
+    assert PRE in "".join(minify_html_stream(chunks, stats))
+    assert stats["minified_size"] < stats["original_size"]
+
+def test_presentation_code_blocks_survive_minification():
+    md_content = "# Code\n\n```\nfor i in range(3):\n    print(i,   i)\n```\n\nText   after.\n"
+    plain = md_to_html_presentation(md_content)
+    minified = md_to_html_presentation(md_content, minify=True)
+    pre_elements = re.findall(r"<pre\b.*?</pre>", plain, re.DOTALL)
+    assert pre_elements
+    for pre in pre_elements:
+        assert pre in minified
+    assert len(minified) < len(plain)
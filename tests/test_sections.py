@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("markdown")
+
+from app import iter_presentation_html, minify_html, render_markdown_section, split_markdown_sections
+
+DOCUMENTS = {
+    "footnote": "# Intro\n\nSee note[^1].\n\n## Details\n\nMore text.\n\n[^1]: The footnote.\n",
+    "reference link": "# Intro\n\nVisit [site][x].\n\n## Links\n\n[x]: https://example.com\n\nDone.\n",
+    "abbreviation": "# Intro\n\nThe HTML spec.\n\n## Glossary\n\n*[HTML]: Hyper Text Markup Language\n\nHTML again.\n",
+    "tilde fence": "# Code\n\n~~~\n# not heading\n~~~\n\n## Next\n\nText.\n",
+    "nested fences": "# Code\n\n````\n```\n# not heading\n```\n````\n\n~~~~\n~~~ not a close\n# still code\n~~~~\n\n## Next\n\nText.\n",
+}
+
+def render_by_sections(md_content):
+    return "".join("".join(render_markdown_section(section)) for section in split_markdown_sections(md_content))
+
+def render_whole(md_content):
+    return "".join(list(iter_presentation_html(md_content))[1:-1])
+
+@pytest.mark.parametrize("md_content", DOCUMENTS.values(), ids=DOCUMENTS.keys())
+def test_sections_render_like_whole_document(md_content):
+    assert minify_html(render_by_sections(md_content)) == minify_html(render_whole(md_content))
+
+def test_fenced_headings_do_not_split():
+    assert len(split_markdown_sections(DOCUMENTS["tilde fence"])) == 2
+    assert len(split_markdown_sections(DOCUMENTS["nested fences"])) == 2
+
+def test_footnotes_keep_document_whole():
+    assert split_markdown_sections(DOCUMENTS["footnote"]) == [DOCUMENTS["footnote"]]
@@ -0,0 +1,252 @@
+"""
+Watch mode: rebuild presentations for a tree of markdown files as they change
+
+The content tree is polled; a manifest in the output directory records each file's
+stat, source hash and section hashes together with the rendering parameters. Only
+decks whose source actually changed are rebuilt, and within a deck only the changed
+sections (split at # and ## headings) are converted again. Outputs are written
+atomically next to a mirror of the source layout, as <name>_presentation.html.
+
+Usage:
+    python watch_build.py reports/ --out build/ --interval 1
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+from pathlib import Path
+
+import document_cache
+from app import minify_html, render_markdown_section, split_markdown_sections, wrap_presentation
+
+logger = logging.getLogger("watch_build")
+
+MANIFEST_NAME = ".watch_manifest.json"
+MANIFEST_VERSION = 1
+
+def _hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _file_mode(path):
+    """Permissions for a rewritten file: those of the existing file, else what open() would give a new one"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def atomic_write(path, content):
+    """Write a text file so readers only ever see the old or the complete new content"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        # mkstemp creates the file private to its owner; the web server serving the output may run as another user
+        os.chmod(tmp_name, _file_mode(path))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+def scan_sources(content_dir):
+    """Map each .md file under content_dir (relative POSIX path) to its (mtime_ns, size)"""
+    sources = {}
+    pending = [content_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(".md") and entry.is_file():
+                    stat = entry.stat()
+                    rel = Path(entry.path).relative_to(content_dir).as_posix()
+                    sources[rel] = (stat.st_mtime_ns, stat.st_size)
+    return sources
+
+class WatchBuilder:
+    """Incremental builder for one content tree and one set of rendering parameters"""
+
+    def __init__(self, content_dir, out_dir, theme="white", transition="slide", max_chars_per_slide=1500,
+                 max_paragraphs_per_slide=6, h1_size=48, h2_size=36, body_size=24, minify=False):
+        self.content_dir = Path(content_dir)
+        self.out_dir = Path(out_dir)
+        self.params = {
+            "theme": theme,
+            "transition": transition,
+            "max_chars_per_slide": max_chars_per_slide,
+            "max_paragraphs_per_slide": max_paragraphs_per_slide,
+            "h1_size": h1_size,
+            "h2_size": h2_size,
+            "body_size": body_size,
+            "minify": minify,
+        }
+        self.manifest_path = self.out_dir / MANIFEST_NAME
+        self.decks = self._load_decks()
+        # (section hash, max chars, max paragraphs) -> rendered <section> elements
+        self.section_cache = {}
+
+    def _load_decks(self):
+        """Deck entries of the saved manifest, or none if it was built with other parameters"""
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("params") != self.params:
+            logger.info("rendering parameters changed, rebuilding every deck")
+            return {}
+        return manifest.get("decks", {})
+
+    def _save_manifest(self):
+        manifest = {"version": MANIFEST_VERSION, "params": self.params, "decks": self.decks}
+        atomic_write(self.manifest_path, json.dumps(manifest, ensure_ascii=False))
+
+    def output_path(self, rel):
+        rel = Path(rel)
+        return self.out_dir / rel.parent / f"{rel.stem}_presentation.html"
+
+    def poll(self):
+        """Check the tree once and rebuild what changed; returns the number of decks rebuilt"""
+        started = time.perf_counter()
+        sources = scan_sources(self.content_dir)
+        manifest_dirty = False
+        rebuilt = 0
+
+        for rel, (mtime_ns, size) in sources.items():
+            entry = self.decks.get(rel)
+            if entry is not None and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                continue
+            manifest_dirty = True
+            try:
+                if self.build_deck(rel, mtime_ns, size):
+                    rebuilt += 1
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error("%s: build failed, retrying when the file changes (%s)", rel, e)
+                self._record_failure(rel, mtime_ns, size)
+
+        for rel in set(self.decks) - set(sources):
+            manifest_dirty = True
+            self._forget_sections(self.decks.pop(rel)["section_hashes"])
+            try:
+                self.output_path(rel).unlink()
+            except FileNotFoundError:
+                pass
+            logger.info("%s: removed", rel)
+
+        if manifest_dirty:
+            self._save_manifest()
+            logger.info("poll finished in %.1f ms (%d of %d decks rebuilt)",
+                        (time.perf_counter() - started) * 1000, rebuilt, len(sources))
+        else:
+            logger.debug("no changes (%d decks checked in %.1f ms)", len(sources), (time.perf_counter() - started) * 1000)
+        return rebuilt
+
+    def _record_failure(self, rel, mtime_ns, size):
+        """Remember the stat of a deck that could not be built, so it is only retried once it changes"""
+        entry = self.decks.setdefault(rel, {"section_hashes": []})
+        entry.update(mtime_ns=mtime_ns, size=size, source_hash=None)
+
+    def _section_key(self, section_hash):
+        return section_hash, self.params["max_chars_per_slide"], self.params["max_paragraphs_per_slide"]
+
+    def _forget_sections(self, section_hashes):
+        for section_hash in section_hashes:
+            self.section_cache.pop(self._section_key(section_hash), None)
+
+    def build_deck(self, rel, mtime_ns, size):
+        """Rebuild one deck if its content changed; returns False when only its stat changed"""
+        started = time.perf_counter()
+        try:
+            source = (self.content_dir / rel).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            # Deleted between the scan and the read; the next poll removes it
+            return False
+
+        source_hash = _hash(source)
+        entry = self.decks.get(rel)
+        output = self.output_path(rel)
+        if entry is not None and entry["source_hash"] == source_hash and output.exists():
+            entry["mtime_ns"], entry["size"] = mtime_ns, size
+            return False
+
+        sections = split_markdown_sections(source)
+        section_hashes = [_hash(section) for section in sections]
+        slides = []
+        converted = 0
+        for section, section_hash in zip(sections, section_hashes):
+            key = self._section_key(section_hash)
+            rendered = self.section_cache.get(key)
+            if rendered is None:
+                rendered = render_markdown_section(section, self.params["max_chars_per_slide"],
+                                                   self.params["max_paragraphs_per_slide"])
+                self.section_cache[key] = rendered
+                converted += 1
+            slides.extend(rendered)
+
+        if entry is not None:
+            self._forget_sections(set(entry["section_hashes"]) - set(section_hashes))
+
+        presentation_html = wrap_presentation("".join(slides), self.params["theme"], self.params["transition"],
+                                              self.params["h1_size"], self.params["h2_size"], self.params["body_size"])
+        if self.params["minify"]:
+            presentation_html = minify_html(presentation_html)
+        atomic_write(output, presentation_html)
+
+        self.decks[rel] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "source_hash": source_hash,
+            "section_hashes": section_hashes,
+        }
+        logger.info("%s: rebuilt in %.1f ms (%d of %d sections converted)",
+                    rel, (time.perf_counter() - started) * 1000, converted, len(sections))
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild presentations for changed markdown files")
+    parser.add_argument("content_dir", help="directory tree with .md files")
+    parser.add_argument("--out", default="build", help="output directory")
+    parser.add_argument("--interval", type=float, default=1.0, help="polling interval in seconds")
+    parser.add_argument("--once", action="store_true", help="build once and exit")
+    parser.add_argument("--theme", default="white")
+    parser.add_argument("--transition", default="slide")
+    parser.add_argument("--max-chars", type=int, default=1500, help="maximum characters per slide")
+    parser.add_argument("--max-paragraphs", type=int, default=6, help="maximum paragraphs per slide")
+    parser.add_argument("--h1-size", type=int, default=48)
+    parser.add_argument("--h2-size", type=int, default=36)
+    parser.add_argument("--body-size", type=int, default=24)
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace in the output")
+    parser.add_argument("--cache-dir", help="keep parsed documents here so restarts and restyling skip parsing")
+    parser.add_argument("--verbose", action="store_true", help="also log polls without changes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
+
+    if args.cache_dir:
+        document_cache.default_cache.directory = Path(args.cache_dir)
+
+    builder = WatchBuilder(args.content_dir, args.out, args.theme, args.transition, args.max_chars,
+                           args.max_paragraphs, args.h1_size, args.h2_size, args.body_size, args.minify)
+    try:
+        while True:
+            try:
+                builder.poll()
+            except Exception:
+                logger.exception("poll failed")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()